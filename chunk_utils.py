@@ -1,7 +1,18 @@
 import os
+import json
 import time
 
-from config import CHUNK_SIZE
+from config import CHUNK_SIZE, MIN_CHUNK_SIZE, MAX_CHUNK_SIZE, TARGET_PARALLELISM
+
+
+def choose_chunk_size(file_size, parallelism=TARGET_PARALLELISM):
+    """Chunk size giving ~`parallelism` parts, clamped to [MIN_CHUNK_SIZE, MAX_CHUNK_SIZE].
+
+    Parts are evened out so a file never ends in a tiny tail part.
+    """
+    size = min(max(-(-file_size // parallelism), MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+    parts = max(1, -(-file_size // size))
+    return max(1, -(-file_size // parts))
 
 
 def split_file(filepath, output_dir, chunk_size=CHUNK_SIZE):
@@ -27,9 +38,38 @@ def split_file(filepath, output_dir, chunk_size=CHUNK_SIZE):
     return parts
 
 
+def part_index(chunk_name):
+    """N from '<name>.partN<ext>', so part10 orders after part9."""
+    return int(os.path.splitext(chunk_name)[0].rsplit(".part", 1)[1])
+
+
+def manifest_name(filename):
+    name, _ = os.path.splitext(os.path.basename(filename))
+    return f"{name}.manifest.json"
+
+
+def write_manifest(output_dir, filename, size, chunk_size, parts):
+    """Record how `filename` was split, next to its parts."""
+    manifest = {
+        "file": os.path.basename(filename),
+        "size": size,
+        "chunk_size": chunk_size,
+        "parts": parts,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, manifest_name(filename)), "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def read_manifest(path):
+    with open(path) as f:
+        return json.load(f)
+
+
 def combine_file(parts, output_path):
     with open(output_path, "wb") as f:
-        for part in sorted(parts):
+        for part in sorted(parts, key=part_index):
             with open(part, "rb") as pf:
                 f.write(pf.read())
 
@@ -1,4 +1,7 @@
-CHUNK_SIZE = 2048 * 1024
+CHUNK_SIZE = 2048 * 1024          # default / fallback when a file has no manifest
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 8192 * 1024
+TARGET_PARALLELISM = 8            # parts per file the distribution tools aim for
 TRACKER_HOST = "tracker"
 TRACKER_PORT = 9090
 ORIGINAL_MUSIC_DIR = "tools/music"
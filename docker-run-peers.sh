@@ -1,11 +1,11 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-NUM_PEERS=50
+NUM_PEERS=${1:-50}
 
-# remove old peers
-for i in $(seq 1 $NUM_PEERS); do
-  docker rm -f peer$i >/dev/null 2>&1 || true
+# remove every old peer, including any beyond NUM_PEERS from a bigger run
+for name in $(docker ps -a --format '{{.Names}}' | grep -E '^peer[0-9]+$' || true); do
+  docker rm -f $name >/dev/null 2>&1 || true
 done
 
 # tear down tracker & network
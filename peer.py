@@ -1,10 +1,15 @@
 import os
 import sys
+import json
 import time
+import random
+import statistics
+import queue
+import itertools
 import threading
 import socket
 from concurrent.futures import ThreadPoolExecutor
-from config import TRACKER_HOST, TRACKER_PORT, ORIGINAL_MUSIC_DIR, CC_ALGO
+from config import TRACKER_HOST, TRACKER_PORT, ORIGINAL_MUSIC_DIR, CC_ALGO, CHUNK_SIZE
 import ssl
 
 # Monkey-patch socket.socket to set TCP congestion control
@@ -20,13 +25,25 @@ def _socket_with_cc(family=socket.AF_INET, type=socket.SOCK_STREAM, proto=0, fil
 socket.socket = _socket_with_cc
 
 import Pyro4
-from chunk_utils import combine_file, tracker_call
+from chunk_utils import combine_file, manifest_name, part_index, read_manifest, tracker_call, write_manifest
 
 # Pyro4 conf
 Pyro4.config.SERIALIZER = "pickle"
 Pyro4.config.SERIALIZERS_ACCEPTED.add("pickle")
 Pyro4.config.COMMTIMEOUT = 10
 
+
+class CountingProxy(Pyro4.Proxy):
+    """Pyro4 proxy that counts outgoing RPCs (heartbeats excluded) for benchmarking."""
+    calls = 0
+    _calls_lock = threading.Lock()
+
+    def _pyroInvoke(self, methodname, *args, **kwargs):
+        if methodname != "heartbeat":
+            with CountingProxy._calls_lock:
+                CountingProxy.calls += 1
+        return super()._pyroInvoke(methodname, *args, **kwargs)
+
 # Determine this peer’s ID
 env_id = os.environ.get("PEER_ID")
 if not env_id:
@@ -37,9 +54,23 @@ print(f"[PEER {PEER_NUM}] starting up…")
 
 # Paths & constants
 MUSIC_DIR = os.path.join("peers", f"peer{PEER_NUM}", "music")
+STATS_PATH = os.path.join(MUSIC_DIR, "peer_stats.json")  # survives one-shot `get` runs
+STATS_MAX_AGE = 3600      # seconds before a stored estimate is dropped as stale
 HEARTBEAT_INTERVAL = 10
 MAX_WORKERS = 100
 
+# Source selection: EWMA weight for new samples, and the endgame thresholds
+STATS_ALPHA = 0.3
+ENDGAME_FRACTION = 0.25   # endgame covers at most this share of a track's parts
+ENDGAME_DUPLICATES = 1    # extra holders raced per outstanding chunk
+
+# Download scheduler: the current track always outranks prefetch of upcoming ones
+PRIORITY_CURRENT = 0
+PRIORITY_PREFETCH = 1
+PREFETCH_CHUNKS = 2                        # leading parts prefetched per upcoming track
+PREFETCH_MAX_INFLIGHT = 4                  # concurrent prefetch transfers (bandwidth budget)
+PREFETCH_DISK_BUDGET = 32 * CHUNK_SIZE     # bytes of prefetched, not-yet-current parts
+
 # Your container’s hostname for Pyro NAT advertising
 HOSTNAME = socket.gethostname()
 
@@ -66,6 +97,17 @@ def discover_chunks():
     ]
 
 
+def discover_manifests():
+    manifests = []
+    for fname in os.listdir(MUSIC_DIR):
+        if fname.endswith(".manifest.json"):
+            try:
+                manifests.append(read_manifest(os.path.join(MUSIC_DIR, fname)))
+            except (OSError, ValueError) as e:
+                print(f"[PEER {PEER_NUM}] Ignoring bad manifest {fname}: {e}")
+    return manifests
+
+
 def run_heartbeat(tracker, my_uri):
     while True:
         try:
@@ -75,71 +117,404 @@ def run_heartbeat(tracker, my_uri):
         time.sleep(HEARTBEAT_INTERVAL)
 
 
-def download_chunk(tracker, my_uri, chunk_name, dest_path):
+class PeerStats:
+    """Moving estimates of each source peer's throughput and RTT."""
+
+    def __init__(self, alpha=STATS_ALPHA):
+        self._lock = threading.Lock()
+        self.alpha = alpha
+        self.throughput = {}  # peer_uri -> bytes/sec
+        self.rtt = {}         # peer_uri -> seconds
+        self.updated = {}     # peer_uri -> time of last sample
+
+    def load(self, path):
+        """Pick up estimates saved by earlier runs, skipping stale ones."""
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        cutoff = time.time() - STATS_MAX_AGE
+        with self._lock:
+            for peer_uri, (throughput, rtt, updated) in saved.items():
+                if updated >= cutoff:
+                    self.throughput[peer_uri] = throughput
+                    self.rtt[peer_uri] = rtt
+                    self.updated[peer_uri] = updated
+
+    def save(self, path):
+        with self._lock:
+            saved = {
+                p: [self.throughput[p], self.rtt[p], self.updated[p]]
+                for p in self.throughput
+            }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(saved, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[PEER {PEER_NUM}] Could not save peer stats: {e}")
+
+    def _blend(self, table, peer_uri, sample):
+        old = table.get(peer_uri)
+        table[peer_uri] = sample if old is None else old + self.alpha * (sample - old)
+        self.updated[peer_uri] = time.time()
+
+    def record(self, peer_uri, nbytes, rtt, transfer):
+        """Fold one successful fetch into the peer's estimates."""
+        with self._lock:
+            self._blend(self.rtt, peer_uri, rtt)
+            self._blend(self.throughput, peer_uri, nbytes / max(transfer, 1e-6))
+
+    def record_failure(self, peer_uri, nbytes=CHUNK_SIZE):
+        """Penalise a peer that stalled or dropped the connection, as if nbytes
+        had taken the whole COMMTIMEOUT."""
+        timeout = Pyro4.config.COMMTIMEOUT or 10
+        with self._lock:
+            self._blend(self.rtt, peer_uri, timeout)
+            self._blend(self.throughput, peer_uri, nbytes / timeout)
+
+    def expected_time(self, peer_uri, nbytes=CHUNK_SIZE):
+        """Estimated seconds to pull nbytes, or None if the peer is unmeasured."""
+        with self._lock:
+            if peer_uri not in self.throughput:
+                return None
+            return self.rtt[peer_uri] + nbytes / self.throughput[peer_uri]
+
+    def rank(self, peers, nbytes=CHUNK_SIZE):
+        """Fastest first. Unmeasured peers score as the median measured one, so they
+        are probed ahead of known-slow peers but behind known-fast ones; ties are
+        broken randomly to spread load."""
+        times = {p: self.expected_time(p, nbytes) for p in peers}
+        known = [t for t in times.values() if t is not None]
+        unknown = statistics.median(known) if known else 0.0
+        return sorted(peers, key=lambda p: (unknown if times[p] is None else times[p], random.random()))
+
+
+PEER_STATS = PeerStats()
+
+
+class ChunkRace:
+    """Concurrent requests for one chunk: the first delivery wins, the rest are cancelled."""
+
+    def __init__(self, chunk_name, nbytes=CHUNK_SIZE):
+        self.chunk_name = chunk_name
+        self.nbytes = nbytes  # expected size, for ranking holders
+        self.done = threading.Event()    # claimed: stop every other request
+        self.stored = threading.Event()  # bytes are on disk
+        self.holders = None   # set once the tracker has answered
+        self.started = False  # a scheduler worker has picked it up
+        self._lock = threading.Lock()
+        self._active = {}     # id(proxy) -> (proxy, peer_uri)
+
+    def attach(self, proxy, peer_uri):
+        with self._lock:
+            if self.done.is_set():
+                return False
+            self._active[id(proxy)] = (proxy, peer_uri)
+            return True
+
+    def detach(self, proxy):
+        with self._lock:
+            self._active.pop(id(proxy), None)
+
+    def active_peers(self):
+        with self._lock:
+            return {uri for _, uri in self._active.values()}
+
+    def claim(self, proxy):
+        """Mark the chunk as delivered by `proxy` and abort every other request."""
+        with self._lock:
+            if self.done.is_set():
+                return False
+            self.done.set()
+            losers = [p for p, _ in self._active.values() if p is not proxy]
+        for loser in losers:
+            _abort_call(loser)
+        return True
+
+
+def _abort_call(proxy):
+    # Pyro4 holds the proxy lock for the whole call, so _pyroRelease() would
+    # block; shutting the socket down makes the pending recv fail instead.
     try:
-        peers = tracker.peersForChunk(chunk_name)
-    except Exception as e:
-        print(f"[{my_uri}] Tracker query failed for chunk {chunk_name}: {e}")
-        return False
+        proxy._pyroConnection.sock.shutdown(socket.SHUT_RDWR)
+    except Exception:
+        pass
+
 
-    # don't fetch from yourself
-    peers = [p for p in peers if p != my_uri]
+def download_chunk(tracker, my_uri, chunk_name, dest_path, peers=None, race=None):
+    race = race or ChunkRace(chunk_name)
+    if peers is None:
+        try:
+            peers = tracker.peersForChunk(chunk_name)
+        except Exception as e:
+            print(f"[{my_uri}] Tracker query failed for chunk {chunk_name}: {e}")
+            return False
+
+        # don't fetch from yourself
+        peers = [p for p in peers if p != my_uri]
+        race.holders = peers
     if not peers:
         print(f"[{my_uri}] No peers found for chunk '{chunk_name}'")
         return False
 
-    for peer_uri in peers:
-        try:
-            peer = Pyro4.Proxy(peer_uri)
-            data = peer.get_chunk(chunk_name)
-            if isinstance(data, bytes):
-                with open(dest_path, "wb") as f:
-                    f.write(data)
-                tracker.updateChunkList(my_uri, chunk_name)
-                print(f"[{my_uri}] Downloaded chunk '{chunk_name}' from {peer_uri}")
-                return True
-        except Exception as e:
-            print(f"[{my_uri}] Failed to get '{chunk_name}' from {peer_uri}: {e}")
+    for peer_uri in PEER_STATS.rank(peers, race.nbytes):
+        if race.done.is_set():
+            return False
+        with CountingProxy(peer_uri) as peer:
+            if not race.attach(peer, peer_uri):
+                return False
+            try:
+                start = time.time()
+                peer._pyroBind()
+                rtt = time.time() - start
+                # claimed while we were connecting: the abort found no socket yet
+                if race.done.is_set():
+                    return False
+                data = peer.get_chunk(chunk_name)
+                if isinstance(data, bytes):
+                    PEER_STATS.record(peer_uri, len(data), rtt, time.time() - start - rtt)
+                    if not race.claim(peer):
+                        return False
+                    return store_chunk(tracker, my_uri, race, dest_path, data, peer_uri)
+            except Exception as e:
+                if race.done.is_set():
+                    print(f"[{my_uri}] Cancelled '{chunk_name}' from {peer_uri}")
+                    return False
+                # only a stall/broken link says anything about speed; a remote
+                # error (e.g. FileNotFoundError from a stale tracker entry) just
+                # means this holder is skipped for this chunk
+                if isinstance(e, Pyro4.errors.CommunicationError):
+                    PEER_STATS.record_failure(peer_uri, race.nbytes)
+                print(f"[{my_uri}] Failed to get '{chunk_name}' from {peer_uri}: {e}")
+            finally:
+                race.detach(peer)
 
     print(f"[{my_uri}] All attempts failed for chunk '{chunk_name}'")
     return False
 
 
-def parallel_download(tracker, my_uri, parts):
-    with ThreadPoolExecutor(MAX_WORKERS) as pool:
-        futures = [
-            pool.submit(download_chunk, tracker, my_uri, c, os.path.join(MUSIC_DIR, c))
-            for c in parts
-        ]
-    return [f.result() for f in futures]
+def store_chunk(tracker, my_uri, race, dest_path, data, peer_uri):
+    """Write a claimed chunk and announce it; race.stored is set only once it is on disk."""
+    try:
+        with open(dest_path, "wb") as f:
+            f.write(data)
+    except OSError as e:
+        print(f"[{my_uri}] Could not write chunk '{race.chunk_name}' to {dest_path}: {e}")
+        return False
+    race.stored.set()
+    try:
+        tracker.updateChunkList(my_uri, race.chunk_name)
+    except Exception as e:
+        print(f"[{my_uri}] Tracker update failed for chunk {race.chunk_name}: {e}")
+    print(f"[{my_uri}] Downloaded chunk '{race.chunk_name}' from {peer_uri}")
+    return True
 
 
-def handle_get_command(tracker, my_uri, filename):
-    """Invoke the same logic as interactive 'get', then exit."""
-    # 1) Resolve & download missing parts
-    start = time.time()
-    print(f"[PEER {PEER_NUM}] (CLI) Resolving '{filename}'...")
+def endgame_sources(race):
+    """Fastest holders of a chunk that are not already serving it."""
+    busy = race.active_peers()
+    idle = [p for p in race.holders or [] if p not in busy]
+    return PEER_STATS.rank(idle, race.nbytes)[:ENDGAME_DUPLICATES]
+
+
+class DownloadScheduler:
+    """One priority queue and worker pool shared by every queued track."""
+
+    def __init__(self, tracker, my_uri, workers=MAX_WORKERS):
+        self.tracker = tracker
+        self.my_uri = my_uri
+        self._jobs = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._races = {}      # chunk_name -> ChunkRace
+        self._attempts = {}   # chunk_name -> queued or running attempts
+        self._reserved = {}   # prefetched chunk_name -> bytes held against the disk budget
+        self._deferred = []   # prefetch jobs waiting for a bandwidth slot
+        self._prefetching = 0
+        self._workers = workers  # started on first use, so serve-only peers stay light
+        self._started = False
+
+    def _start_workers(self):
+        # caller holds self._cond
+        if self._started:
+            return
+        self._started = True
+        for _ in range(self._workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def _live_race(self, chunk_name):
+        """The chunk's race if it is in flight or already delivered, else None."""
+        race = self._races.get(chunk_name)
+        if race is None:
+            return None
+        if race.stored.is_set():
+            return race if os.path.isfile(os.path.join(MUSIC_DIR, chunk_name)) else None
+        return race if self._attempts.get(chunk_name) else None
+
+    def _submit(self, chunk_name, priority, peers=None):
+        # caller holds self._cond
+        self._start_workers()
+        self._attempts[chunk_name] = self._attempts.get(chunk_name, 0) + 1
+        self._jobs.put((priority, next(self._seq), chunk_name, peers))
+
+    def _refill(self):
+        # caller holds self._cond: hand deferred prefetches back while slots are free
+        free = PREFETCH_MAX_INFLIGHT - self._prefetching
+        while self._deferred and free > 0:
+            self._jobs.put(self._deferred.pop(0))
+            free -= 1
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            priority, _, chunk_name, peers = job
+            prefetch = priority == PRIORITY_PREFETCH
+            with self._cond:
+                race = self._races[chunk_name]
+                if prefetch and chunk_name in self._reserved and self._prefetching >= PREFETCH_MAX_INFLIGHT:
+                    self._deferred.append(job)
+                    continue
+                # a prefetch is dropped once its track became current (or got cancelled)
+                skip = race.done.is_set() or (prefetch and chunk_name not in self._reserved)
+                if not skip:
+                    race.started = True
+                    if prefetch:
+                        self._prefetching += 1
+            try:
+                if not skip:
+                    download_chunk(self.tracker, self.my_uri, chunk_name,
+                                   os.path.join(MUSIC_DIR, chunk_name), peers=peers, race=race)
+            finally:
+                with self._cond:
+                    if prefetch and not skip:
+                        self._prefetching -= 1
+                    self._attempts[chunk_name] -= 1
+                    self._refill()
+                    self._cond.notify_all()
+
+    def release(self, parts):
+        """Stop counting parts against the prefetch budget; queued prefetches of them are dropped."""
+        with self._cond:
+            for c in parts:
+                self._reserved.pop(c, None)
+            # deferred jobs for these parts would only be skipped: drop them now
+            # so wait() and _live_race() never count an attempt that won't run
+            released = set(parts)
+            kept = []
+            for job in self._deferred:
+                chunk_name = job[2]
+                if chunk_name in released:
+                    self._attempts[chunk_name] -= 1
+                else:
+                    kept.append(job)
+            self._deferred = kept
+            self._cond.notify_all()
+
+    def request(self, parts, chunk_size=CHUNK_SIZE):
+        """Queue parts of the current track at top priority."""
+        with self._cond:
+            for c in parts:
+                race = self._live_race(c)
+                if race is None:
+                    self._races[c] = ChunkRace(c, chunk_size)
+                    self._submit(c, PRIORITY_CURRENT)
+                elif not race.done.is_set() and not race.started:
+                    # prefetch never got a worker: re-queue it at top priority
+                    self._submit(c, PRIORITY_CURRENT)
+
+    def prefetch(self, parts, chunk_size=CHUNK_SIZE):
+        """Queue parts of an upcoming track while the disk budget allows."""
+        with self._cond:
+            for c in parts:
+                if self._live_race(c) is not None:
+                    continue
+                if sum(self._reserved.values()) + chunk_size > PREFETCH_DISK_BUDGET:
+                    return
+                self._reserved[c] = chunk_size
+                self._races[c] = ChunkRace(c, chunk_size)
+                self._submit(c, PRIORITY_PREFETCH)
+
+    def wait(self, parts, total_parts=None):
+        """Block until every part settles, racing the tail in endgame; returns per-part success.
+
+        total_parts is the whole track's part count (parts may be only the missing ones).
+        """
+        total_parts = total_parts or len(parts)
+        duplicated = set()
+        with self._cond:
+            while True:
+                outstanding = [
+                    c for c in parts
+                    if not self._races[c].stored.is_set() and self._attempts.get(c)
+                ]
+                if not outstanding:
+                    break
+                # endgame (as in BitTorrent): only once some parts of the track are
+                # in, the tail is small, and every outstanding part is being fetched
+                in_endgame = (
+                    len(outstanding) < total_parts
+                    and len(outstanding) <= max(1, int(total_parts * ENDGAME_FRACTION))
+                    and all(self._races[c].active_peers() for c in outstanding)
+                )
+                if in_endgame:
+                    # race the tail chunks against the fastest other holders
+                    for c in outstanding:
+                        if c in duplicated:
+                            continue
+                        sources = endgame_sources(self._races[c])
+                        if not sources:
+                            continue
+                        duplicated.add(c)
+                        print(f"[{self.my_uri}] Endgame: racing '{c}' on {sources}")
+                        for peer_uri in sources:
+                            self._submit(c, PRIORITY_CURRENT, peers=[peer_uri])
+                self._cond.wait(timeout=1)
+            return [self._races[c].stored.is_set() for c in parts]
+
+
+def resolve_chunks(tracker, my_uri, filename):
+    """Chunk list and manifest (None for files split before manifests existed)."""
     all_chunks = tracker_call(
         tracker.getChunksForFile,
         filename,
         description="Get chunk list"
     )
     if not all_chunks:
-        print(f"[{my_uri}] No chunks found or tracker down.")
-        return False
+        print(f"[{my_uri}] No chunks found for '{filename}' or tracker down.")
+        return all_chunks, None
+    manifest = tracker_call(
+        tracker.getManifest,
+        filename,
+        description="Get manifest"
+    )
+    if manifest:
+        # drop leftovers of an earlier split that the prefix match still returns
+        stale = [c for c in all_chunks if part_index(c) >= manifest["parts"]]
+        if stale:
+            print(f"[{my_uri}] Ignoring stale parts of '{filename}': {stale}")
+            all_chunks = [c for c in all_chunks if part_index(c) < manifest["parts"]]
+        known = {part_index(c) for c in all_chunks}
+        lost = [i for i in range(manifest["parts"]) if i not in known]
+        if lost:
+            print(f"[{my_uri}] Parts {lost} of '{filename}' are not held by any peer.")
+            return None, manifest
+    return all_chunks, manifest
+
+
+def chunk_size_of(manifest):
+    return manifest["chunk_size"] if manifest else CHUNK_SIZE
 
+
+def missing_chunks(all_chunks):
     existing = set(discover_chunks())
-    missing = [c for c in all_chunks if c not in existing]
-    if missing:
-        print(f"[PEER {PEER_NUM}] Downloading missing parts: {missing}")
-        results = parallel_download(tracker, my_uri, missing)
-        if not all(results):
-            print(f"[{my_uri}] Download failures; aborting.")
-            return False
-    else:
-        print(f"[PEER {PEER_NUM}] All parts present; skipping download.")
+    return [c for c in all_chunks if c not in existing]
 
-    # 2) Combine all known parts into the final file
+
+def finish_track(filename, all_chunks, manifest, start):
+    # Combine all known parts into the final file
     paths = [os.path.join(MUSIC_DIR, c) for c in all_chunks]
     output_path = os.path.join(MUSIC_DIR, filename)
     combine_file(paths, output_path)
@@ -148,22 +523,93 @@ def handle_get_command(tracker, my_uri, filename):
     dur = f"{end-start:.3f}"
     print(f"[PEER {PEER_NUM}] Time = {dur}")
 
-    # 3) Size‐validation against the original master file
+    # Size‐validation against the manifest, else the original master file
     orig = os.path.join(ORIGINAL_MUSIC_DIR, filename)
-    if os.path.isfile(orig):
-        got = os.path.getsize(output_path)
-        want = os.path.getsize(orig)
-        if got != want:
-            print(f"[PEER {PEER_NUM}] Size mismatch: got {got} bytes, expected {want} bytes")
-            return False
-        else:
-            print(f"[PEER {PEER_NUM}] Size check: {got} bytes (matches original)")
+    if manifest:
+        want, source = manifest["size"], "manifest"
+        # keep the manifest so it is re-registered alongside our parts
+        if not os.path.isfile(os.path.join(MUSIC_DIR, manifest_name(filename))):
+            write_manifest(MUSIC_DIR, filename, want, manifest["chunk_size"], manifest["parts"])
+    elif os.path.isfile(orig):
+        want, source = os.path.getsize(orig), "original"
     else:
-        print(f"[PEER {PEER_NUM}] Warning: original not found at {orig} — skipping size check")
+        print(f"[PEER {PEER_NUM}] Warning: no manifest or original at {orig} — skipping size check")
+        return True
 
+    got = os.path.getsize(output_path)
+    if got != want:
+        print(f"[PEER {PEER_NUM}] Size mismatch: got {got} bytes, expected {want} bytes ({source})")
+        return False
+    print(f"[PEER {PEER_NUM}] Size check: {got} bytes (matches {source})")
     return True
 
 
+def prefetch_track(scheduler, all_chunks, manifest):
+    if all_chunks:
+        leading = sorted(missing_chunks(all_chunks), key=part_index)[:PREFETCH_CHUNKS]
+        scheduler.prefetch(leading, chunk_size_of(manifest))
+
+
+def handle_get_command(tracker, my_uri, filenames, scheduler):
+    """Fetch each file in queue order, prefetching the head of the upcoming ones.
+
+    Time is reported per track, measured from when the command was issued;
+    RPCs is the number of remote calls the whole command made.
+    """
+    start = time.time()
+    rpcs_before = CountingProxy.calls
+
+    # upcoming tracks are resolved (and prefetched) in the background, in
+    # queue order, so they never delay the current track's first request
+    resolver = ThreadPoolExecutor(max_workers=1)
+    resolving = {}  # playlist index -> Future[(all_chunks, manifest)]
+
+    def resolve_and_prefetch(filename):
+        all_chunks, manifest = resolve_chunks(tracker, my_uri, filename)
+        prefetch_track(scheduler, all_chunks, manifest)
+        return all_chunks, manifest
+
+    ok = True
+    for i, filename in enumerate(filenames):
+        # 1) Current track first: use the background result if it is ready or
+        #    in progress, otherwise resolve it here without waiting in line
+        fut = resolving.get(i)
+        if fut is None or fut.cancel():
+            print(f"[PEER {PEER_NUM}] (CLI) Resolving '{filename}'...")
+            all_chunks, manifest = resolve_chunks(tracker, my_uri, filename)
+        else:
+            all_chunks, manifest = fut.result()
+        if not all_chunks:
+            ok = False
+            continue
+
+        missing = missing_chunks(all_chunks)
+        scheduler.release(all_chunks)
+        scheduler.request(missing, chunk_size_of(manifest))
+
+        # 2) Then the leading parts of what comes next, as budget allows
+        for j in range(i + 1, len(filenames)):
+            if j not in resolving:
+                resolving[j] = resolver.submit(resolve_and_prefetch, filenames[j])
+            elif resolving[j].done() and not resolving[j].cancelled():
+                prefetch_track(scheduler, *resolving[j].result())
+
+        if missing:
+            print(f"[PEER {PEER_NUM}] Downloading missing parts: {missing}")
+            if not all(scheduler.wait(missing, len(all_chunks))):
+                print(f"[{my_uri}] Download failures for '{filename}'; skipping.")
+                ok = False
+                continue
+        else:
+            print(f"[PEER {PEER_NUM}] All parts present; skipping download.")
+
+        # 3) Reassemble & validate
+        ok = finish_track(filename, all_chunks, manifest, start) and ok
+
+    resolver.shutdown(wait=False)
+    print(f"[PEER {PEER_NUM}] RPCs = {CountingProxy.calls - rpcs_before}")
+    PEER_STATS.save(STATS_PATH)
+    return ok
 
 
 def main():
@@ -177,21 +623,26 @@ def main():
     print(f"[PEER {PEER_NUM}] serving → {my_uri}")
     threading.Thread(target=daemon.requestLoop, daemon=True).start()
 
+    PEER_STATS.load(STATS_PATH)
+
     # 3) Connect to tracker & register initial chunks
-    tracker = Pyro4.Proxy(f"PYRO:obj_tracker@{TRACKER_HOST}:{TRACKER_PORT}")
+    tracker = CountingProxy(f"PYRO:obj_tracker@{TRACKER_HOST}:{TRACKER_PORT}")
     initial = discover_chunks()
-    tracker.register_chunks(my_uri, initial)
+    tracker.register_chunks(my_uri, initial, discover_manifests())
     print(f"[PEER {PEER_NUM}] registered {len(initial)} parts")
 
     # 4) Start heartbeat
     threading.Thread(target=run_heartbeat, args=(tracker, my_uri), daemon=True).start()
 
-    # 5) If called as CLI: python peer.py get <file>
-    if len(sys.argv) >= 3 and sys.argv[1] == "get":
-        success = handle_get_command(tracker, my_uri, sys.argv[2])
+    # 5) One scheduler shared by every get/queue for the life of the peer
+    scheduler = DownloadScheduler(tracker, my_uri)
+
+    # 6) If called as CLI: python peer.py get <file> [<file> ...]
+    if len(sys.argv) >= 3 and sys.argv[1] in ("get", "queue"):
+        success = handle_get_command(tracker, my_uri, sys.argv[2:], scheduler)
         sys.exit(0 if success else 1)
 
-    # 6) Otherwise interactive loop
+    # 7) Otherwise interactive loop
     while True:
         try:
             cmd = input("> ").strip()
@@ -201,8 +652,14 @@ def main():
             continue
 
         if cmd.startswith("get "):
-            _, filename = cmd.split(" ", 1)
-            handle_get_command(tracker, my_uri, filename)
+            handle_get_command(tracker, my_uri, cmd.split()[1:], scheduler)
+        elif cmd.startswith("queue "):
+            # same as get, but in the background so the prompt stays usable
+            threading.Thread(
+                target=handle_get_command,
+                args=(tracker, my_uri, cmd.split()[1:], scheduler),
+                daemon=True,
+            ).start()
         elif cmd == "files":
             print("Local parts:", discover_chunks())
         elif cmd == "exit":
@@ -6,11 +6,13 @@ import argparse
 import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from chunk_utils import split_file
+from chunk_utils import choose_chunk_size, split_file, write_manifest
+from config import TARGET_PARALLELISM
 
 
 def distribute_chunks(parts, num_peers, replication, dest_root):
     os.makedirs(dest_root, exist_ok=True)
+    holders = set()
     for part in parts:
         targets = random.sample(range(1, num_peers + 1), k=min(replication, num_peers))
         for peer in targets:
@@ -18,6 +20,8 @@ def distribute_chunks(parts, num_peers, replication, dest_root):
             os.makedirs(peer_dir, exist_ok=True)
             shutil.copy(part, os.path.join(peer_dir, os.path.basename(part)))
             print(f"{os.path.basename(part)} → peer{peer}")
+            holders.add(peer)
+    return holders
 
 
 def main():
@@ -32,6 +36,10 @@ def main():
                    help="Where your source .mp3s live")
     p.add_argument("--dest-dir", default="peers",
                    help="Root of peers/peerX/music directories")
+    p.add_argument("--chunk-size", type=int, default=None,
+                   help="Fixed chunk size in bytes (default: chosen per file)")
+    p.add_argument("--parallelism", type=int, default=TARGET_PARALLELISM,
+                   help="Target parts per file when choosing the chunk size")
     args = p.parse_args()
 
     for i in range(1, args.peers + 1):
@@ -48,12 +56,17 @@ def main():
         if not fname.lower().endswith(".mp3"):
             continue
         src = os.path.join(args.music_dir, fname)
-        print(f"\nSplitting {fname} → temp parts")
-        parts = split_file(src, tmp)
+        size = os.path.getsize(src)
+        chunk_size = args.chunk_size or choose_chunk_size(size, args.parallelism)
+        print(f"\nSplitting {fname} → temp parts of {chunk_size} bytes")
+        parts = split_file(src, tmp, chunk_size)
         print(f" → {len(parts)} parts created")
 
-        # distribute those parts
-        distribute_chunks(parts, args.peers, args.replication, args.dest_dir)
+        # distribute those parts, with the manifest alongside on every holder
+        holders = distribute_chunks(parts, args.peers, args.replication, args.dest_dir)
+        for peer in holders:
+            write_manifest(os.path.join(args.dest_dir, f"peer{peer}", "music"),
+                           fname, size, chunk_size, len(parts))
 
         # clean up this run’s parts
         for part in parts:
@@ -7,7 +7,8 @@ import sys
 
 # allow importing your split_file helper
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from chunk_utils import split_file
+from chunk_utils import choose_chunk_size, split_file, write_manifest
+from config import TARGET_PARALLELISM
 
 def main():
     p = argparse.ArgumentParser(
@@ -23,6 +24,10 @@ def main():
                    help="Source .mp3 directory")
     p.add_argument("--dest-dir",        default="peers",
                    help="Root of peers/peerX/music")
+    p.add_argument("--chunk-size", type=int, default=None,
+                   help="Fixed chunk size in bytes (default: chosen per file)")
+    p.add_argument("--parallelism", type=int, default=TARGET_PARALLELISM,
+                   help="Target parts per file when choosing the chunk size")
     args = p.parse_args()
 
     # 1) wipe out any existing peer music dirs
@@ -41,10 +46,13 @@ def main():
         if not fname.lower().endswith(".mp3"):
             continue
         src = os.path.join(args.music_dir, fname)
-        print(f"\nSplitting {fname} …")
-        parts = split_file(src, tmp)
+        size = os.path.getsize(src)
+        chunk_size = args.chunk_size or choose_chunk_size(size, args.parallelism)
+        print(f"\nSplitting {fname} into {chunk_size}-byte parts …")
+        parts = split_file(src, tmp, chunk_size)
         print(f" → {len(parts)} parts generated")
 
+        holders = set()
         for part in parts:
             # drop globally with probability missing
             if random.random() < args.missing:
@@ -58,6 +66,12 @@ def main():
                 os.makedirs(dest_dir, exist_ok=True)
                 shutil.copy(part, os.path.join(dest_dir, os.path.basename(part)))
                 print(f"  → {os.path.basename(part)} → peer{peer}")
+                holders.add(peer)
+
+        # the manifest still lists every part, so peers can tell which are lost
+        for peer in holders:
+            write_manifest(os.path.join(args.dest_dir, f"peer{peer}", "music"),
+                           fname, size, chunk_size, len(parts))
 
         # clean up this file’s parts
         for part in parts:
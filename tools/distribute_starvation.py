@@ -6,7 +6,8 @@ import sys
 
 # allow importing split_file
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from chunk_utils import split_file
+from chunk_utils import choose_chunk_size, split_file, write_manifest
+from config import TARGET_PARALLELISM
 
 def main():
     p = argparse.ArgumentParser(
@@ -20,6 +21,10 @@ def main():
                    help="Directory containing source .mp3 files")
     p.add_argument("--dest-dir",    default="peers",
                    help="Root of peers/peerX/music directories")
+    p.add_argument("--chunk-size", type=int, default=None,
+                   help="Fixed chunk size in bytes (default: chosen per file)")
+    p.add_argument("--parallelism", type=int, default=TARGET_PARALLELISM,
+                   help="Target parts per file when choosing the chunk size")
     args = p.parse_args()
 
     # 1) Clear out all music folders for all peers
@@ -38,8 +43,10 @@ def main():
         if not fname.lower().endswith(".mp3"):
             continue
         src_mp3 = os.path.join(args.music_dir, fname)
-        print(f"\nSplitting {fname} → {tmp}/")
-        parts = split_file(src_mp3, tmp)
+        size = os.path.getsize(src_mp3)
+        chunk_size = args.chunk_size or choose_chunk_size(size, args.parallelism)
+        print(f"\nSplitting {fname} → {tmp}/ ({chunk_size}-byte parts)")
+        parts = split_file(src_mp3, tmp, chunk_size)
         print(f" → {len(parts)} parts")
 
         # copy all parts to the seed peer
@@ -48,6 +55,7 @@ def main():
         for part in parts:
             shutil.copy(part, os.path.join(seed_dir, os.path.basename(part)))
             print(f"{os.path.basename(part)} → peer{args.seed}")
+        write_manifest(seed_dir, fname, size, chunk_size, len(parts))
 
         # cleanup this file’s parts
         for part in parts:
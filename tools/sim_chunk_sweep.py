@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import csv
+import time
+import argparse
+import statistics
+import subprocess
+
+from sim_cold_start import cold_start
+
+
+def redistribute(peers, replication, chunk_size=None):
+    # chunk_size None leaves distribute.py to choose one per file
+    cmd = ["python", "tools/distribute.py", "-n", str(peers), "-r", str(replication)]
+    if chunk_size:
+        cmd += ["--chunk-size", str(chunk_size)]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+
+
+def restart_swarm(peers, settle):
+    # fresh tracker + exactly `peers` peers so every run is a true cold start
+    subprocess.run(["./docker-run-peers.sh", str(peers)], check=True, stdout=subprocess.DEVNULL)
+    time.sleep(settle)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Cold-Start time and RPC overhead across chunk sizes")
+    p.add_argument("--file", "-f", required=True, help="Filename to GET")
+    p.add_argument("--peers", "-n", type=int, default=50, help="Number of peers")
+    p.add_argument("--replication", "-r", type=int, default=3, help="Replicas per chunk")
+    p.add_argument("--sizes", "-s", default="auto,256,512,1024,2048,4096,8192",
+                   help="Comma-separated chunk sizes in KiB; 'auto' = per-file choice")
+    p.add_argument("--settle", type=float, default=5.0,
+                   help="Seconds to let peers register before each run")
+    p.add_argument("--output", "-o", default="chunk_sweep.csv", help="CSV path")
+    args = p.parse_args()
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["chunk_kib", "ok", "median_s", "max_s", "mean_rpcs", "total_rpcs"])
+
+        for kib in args.sizes.split(","):
+            print(f"\n[SWEEP] chunk size {kib} KiB: redistributing and restarting swarm…")
+            redistribute(args.peers, args.replication, None if kib == "auto" else int(kib) * 1024)
+            restart_swarm(args.peers, args.settle)
+
+            results = list(cold_start(args.file, args.peers))
+            durations = [dur for _, _, _, dur, ok, _ in results if ok]
+            rpcs = [n for *_, n in results if n is not None]
+            median_s = f"{statistics.median(durations):.3f}" if durations else ""
+            max_s = f"{max(durations):.3f}" if durations else ""
+            mean_rpcs = f"{statistics.mean(rpcs):.1f}" if rpcs else ""
+            writer.writerow([kib, len(durations), median_s, max_s, mean_rpcs, sum(rpcs)])
+            csvfile.flush()
+            print(f"[SWEEP] {kib} KiB: ok={len(durations)}/{args.peers} "
+                  f"median={median_s}s max={max_s}s mean_rpcs={mean_rpcs}")
+
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import re
 import time
 import csv
 import argparse
@@ -6,18 +7,28 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import subprocess
 
 
+RPC_RE = re.compile(rb"RPCs = (\d+)")
+
+
+def parse_rpcs(output):
+    m = RPC_RE.search(output or b"")
+    return int(m.group(1)) if m else None
+
+
 def fetch(peer_id, filename):
     start = time.time()
     # build the shell command to pipe "get <filename>\n" into peer.py
     cmd = f"printf 'get {filename}\\n' | python peer.py"
     try:
-        subprocess.run(
+        proc = subprocess.run(
             ["docker", "exec", f"peer{peer_id}", "python", "peer.py", "get", filename],
             check=True,
             capture_output=True
         )
         success = True
+        output = proc.stdout
     except subprocess.CalledProcessError as e:
+        output = e.output
         if not e.output:
             success = True
         else:
@@ -26,7 +37,18 @@ def fetch(peer_id, filename):
             success = False
 
     end = time.time()
-    return peer_id, start, end, end - start, success
+    return peer_id, start, end, end - start, success, parse_rpcs(output)
+
+
+def cold_start(filename, peers):
+    """Have every peer GET filename at once; yields fetch() results as they finish."""
+    with ThreadPoolExecutor(max_workers=peers) as pool:
+        futures = {
+            pool.submit(fetch, i, filename): i
+            for i in range(1, peers + 1)
+        }
+        for fut in as_completed(futures):
+            yield fut.result()
 
 
 def main():
@@ -38,20 +60,14 @@ def main():
 
     with open(args.output, "w", newline="") as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow(["peer_id", "start", "end", "duration", "success"])
-
-        with ThreadPoolExecutor(max_workers=args.peers) as pool:
-            futures = {
-                pool.submit(fetch, i, args.file): i
-                for i in range(1, args.peers + 1)
-            }
-            for fut in as_completed(futures):
-                pid, start, end, dur, ok = fut.result()
-                start_s = f"{start:.3f}"
-                end_s = f"{end:.3f}"
-                dur_s = f"{dur:.3f}"
-                writer.writerow([pid, start_s, end_s, dur_s, ok])
-                print(f"Peer{pid}: {dur_s}s  success={ok}")
+        writer.writerow(["peer_id", "start", "end", "duration", "success", "rpcs"])
+
+        for pid, start, end, dur, ok, rpcs in cold_start(args.file, args.peers):
+            start_s = f"{start:.3f}"
+            end_s = f"{end:.3f}"
+            dur_s = f"{dur:.3f}"
+            writer.writerow([pid, start_s, end_s, dur_s, ok, "" if rpcs is None else rpcs])
+            print(f"Peer{pid}: {dur_s}s  success={ok}  rpcs={rpcs}")
 
     print(f"\nResults written to {args.output}")
 
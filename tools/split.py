@@ -3,7 +3,7 @@ import sys
 import shutil
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from chunk_utils import split_file
+from chunk_utils import choose_chunk_size, split_file, write_manifest
 
 SOURCE_FILE = "tools/music/comf_numb.mp3"
 NUM_PEERS = 3
@@ -12,6 +12,7 @@ DEST_DIR = "peers"
 TEMP_DIR = "temp_split"
 
 def distribute_chunks(temp_parts):
+    holders = set()
     for i, part in enumerate(temp_parts):
         peer_num = (i % NUM_PEERS) + 1
         peer_dir = os.path.join(DEST_DIR, f"peer{peer_num}", "music")
@@ -19,12 +20,18 @@ def distribute_chunks(temp_parts):
         dest = os.path.join(peer_dir, os.path.basename(part))
         shutil.move(part, dest)
         print(f"{part} → Peer {peer_num}")
+        holders.add(peer_num)
+    return holders
 
 if __name__ == "__main__":
-    print(f"Splitting {SOURCE_FILE} into chunks...")
-    parts = split_file(SOURCE_FILE, TEMP_DIR)
+    size = os.path.getsize(SOURCE_FILE)
+    chunk_size = choose_chunk_size(size)
+    print(f"Splitting {SOURCE_FILE} into {chunk_size}-byte chunks...")
+    parts = split_file(SOURCE_FILE, TEMP_DIR, chunk_size)
     print(f"➡Distributing {len(parts)} chunks across {NUM_PEERS} peers...")
-    distribute_chunks(parts)
+    for peer_num in distribute_chunks(parts):
+        write_manifest(os.path.join(DEST_DIR, f"peer{peer_num}", "music"),
+                       SOURCE_FILE, size, chunk_size, len(parts))
 
     # cleanup temp dir
     shutil.rmtree(TEMP_DIR)
@@ -34,16 +34,25 @@ class Tracker:
         self._lock = threading.Lock()
         self.chunk_map = defaultdict(set)
         self.last_seen = {}
+        self.manifests = {}
         self.ttl = ttl
         print("[TRACKER] Initialized tracker with TTL =", self.ttl)
         threading.Thread(target=self._reaper, daemon=True).start()
 
-    def register_chunks(self, peer_uri, chunk_names):
+    def register_chunks(self, peer_uri, chunk_names, manifests=None):
         """POST /register_chunks"""
         with self._lock:
             print(f"[TRACKER] REGISTER: {peer_uri} has chunks: {chunk_names}")
             for chunk in chunk_names:
                 self.chunk_map[chunk].add(peer_uri)
+            for manifest in manifests or []:
+                known = self.manifests.get(manifest["file"])
+                if known and (known["chunk_size"], known["parts"]) != (manifest["chunk_size"], manifest["parts"]):
+                    print(f"[TRACKER] CONFLICT: {peer_uri} has a different split of "
+                          f"'{manifest['file']}' ({manifest['chunk_size']} B x {manifest['parts']}); "
+                          f"keeping {known['chunk_size']} B x {known['parts']}")
+                    continue
+                self.manifests[manifest["file"]] = manifest
             self.last_seen[peer_uri] = time.time()
         return True
 
@@ -69,6 +78,11 @@ class Tracker:
             print(f"[TRACKER] Chunks for '{filename_prefix}' → {chunks}")
             return sorted(chunks)
 
+    def getManifest(self, filename):
+        """ Returns how the file was split (size, chunk_size, parts), or None if unknown """
+        with self._lock:
+            return self.manifests.get(filename)
+
     def heartbeat(self, peer_uri):
         """Keep-alive ping"""
         with self._lock: